@@ -5,7 +5,7 @@ if the UI changes slightly (text, role, css classes, etc.).
 """
 from __future__ import annotations
 
-from typing import Iterable, Sequence, Any
+from typing import Iterable, Optional, Sequence, Any
 
 try:
     from playwright.sync_api import Locator, Page, TimeoutError
@@ -88,6 +88,46 @@ START_BUTTON: Sequence[str] = (
     "[data-testid='startTimeRecordingButton']",
 )
 
+STOP_BUTTON: Sequence[str] = (
+    "#recBtnStop",
+    "a:has-text('Gehen')",
+    "a:has-text('Stoppen')",
+    "button:has-text('Gehen')",
+    "button:has-text('Stop')",
+    "button:has-text('Arbeitsende')",
+    "button[data-action*='stop']",
+    "role=button[name=/Gehen|Stop|Arbeitsende/i]",
+    "[data-testid='stopTimeRecordingButton']",
+)
+
+PAUSE_BUTTON: Sequence[str] = (
+    "#recBtnPause",
+    "a:has-text('Pause')",
+    "button:has-text('Pause')",
+    "button:has-text('Pausieren')",
+    "button[data-action*='pause']",
+    "role=button[name=/Pause|Pausieren/i]",
+    "[data-testid='pauseTimeRecordingButton']",
+)
+
+RESUME_BUTTON: Sequence[str] = (
+    "#recBtnResume",
+    "a:has-text('Fortsetzen')",
+    "button:has-text('Fortsetzen')",
+    "button[data-action*='resume']",
+    "role=button[name=/Fortsetzen|Weiter/i]",
+    "[data-testid='resumeTimeRecordingButton']",
+) + tuple(START_BUTTON)  # a paused timer may resume via the regular start button
+
+PAUSED_INDICATORS: Sequence[str] = (
+    "#recDD[data-paused='1']",
+    ".dropdown-toggle.paused",
+    "[data-status*='pause']",
+    ".recTimeIndicator.paused",
+    "#rectime.paused",
+    "text=/pausiert|Pause seit/i",
+)
+
 RUNNING_INDICATORS: Sequence[str] = (
     "#recDD[data-running='1']",
     ".dropdown-toggle.running",
@@ -109,13 +149,13 @@ def _find_first_visible(
     page: Page,
     selectors: Iterable[str],
     timeout: float = 10_000,
-) -> Locator:
+) -> tuple[str, Locator]:
     last_error: TimeoutError | None = None
     for selector in selectors:
         locator = page.locator(selector)
         try:
             locator.wait_for(state="visible", timeout=timeout)
-            return locator
+            return selector, locator
         except TimeoutError as exc:
             last_error = exc
     raise TimeoutError(f"Could not find any selector from: {selectors}") from last_error
@@ -126,29 +166,54 @@ def fill_first(
     selectors: Iterable[str],
     value: str,
     timeout: float = 10_000,
-) -> None:
-    locator = _find_first_visible(page, selectors, timeout)
+) -> str:
+    """Fills the first visible match and returns the selector that matched."""
+    selector, locator = _find_first_visible(page, selectors, timeout)
     locator.fill(value)
+    return selector
 
 
 def click_first(
     page: Page,
     selectors: Iterable[str],
     timeout: float = 10_000,
-) -> None:
-    locator = _find_first_visible(page, selectors, timeout)
+) -> str:
+    """Clicks the first visible match and returns the selector that matched."""
+    selector, locator = _find_first_visible(page, selectors, timeout)
     locator.click()
+    return selector
 
 
-def is_any_visible(page: Page, selectors: Iterable[str]) -> bool:
+def first_visible_selector(
+    page: Page,
+    selectors: Iterable[str],
+    timeout: float = 1_000,
+) -> Optional[str]:
+    """Returns the first selector with a visible match, or None."""
     for selector in selectors:
         locator = page.locator(selector).first
         try:
-            locator.wait_for(state="visible", timeout=1_000)
-            return True
+            locator.wait_for(state="visible", timeout=timeout)
+            return selector
         except TimeoutError:
             continue
-    return False
+    return None
+
+
+def first_visible_now(page: Page, selectors: Iterable[str]) -> Optional[str]:
+    """Returns the first selector visible in the current DOM, without waiting."""
+    for selector in selectors:
+        if page.locator(selector).first.is_visible():
+            return selector
+    return None
+
+
+def visible_now(page: Page, selectors: Iterable[str]) -> bool:
+    return first_visible_now(page, selectors) is not None
+
+
+def is_any_visible(page: Page, selectors: Iterable[str]) -> bool:
+    return first_visible_selector(page, selectors) is not None
 
 
 def close_cookie_banner(page: Page, logger=None) -> bool:
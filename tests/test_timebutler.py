@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import logging
-from datetime import date, timedelta
+import os
+from datetime import date, datetime, timedelta
 from types import SimpleNamespace
 from pathlib import Path
 
+import pytest
+
 import timebutler_run as tb
 
 
@@ -70,3 +73,209 @@ def test_get_current_ssid_parses_netsh_output(monkeypatch):
 
     ssid = timebutler_run.get_current_ssid(MagicMock())
     assert ssid == "TestWiFi"
+
+
+def test_load_trace_settings_clamps_values():
+    settings = {"tracing": {"sample_rate": 5, "max_bytes": -1}}
+    trace = tb.load_trace_settings(settings, DummyLogger())
+    assert trace == {"sample_rate": 1.0, "on_failure": True, "max_bytes": 0}
+
+
+def test_should_sample_trace_respects_rate():
+    assert tb.should_sample_trace(0.0, rng=lambda: 0.0) is False
+    assert tb.should_sample_trace(0.5, rng=lambda: 0.4) is True
+    assert tb.should_sample_trace(0.5, rng=lambda: 0.6) is False
+
+
+def test_prune_trace_store_evicts_oldest_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(tb, "TRACE_DIR", tmp_path)
+    for index in range(3):
+        trace = tmp_path / f"trace_{index}.zip"
+        trace.write_bytes(b"x" * 10)
+        os.utime(trace, (index, index))
+    tb.prune_trace_store(25, DummyLogger())
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["trace_1.zip", "trace_2.zip"]
+
+
+def test_canary_step_records_failure():
+    steps = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        tb._canary_step(steps, "start_button", broken)
+    assert steps[0]["name"] == "start_button"
+    assert steps[0]["status"] == "fail"
+    assert steps[0]["duration_ms"] >= 0
+
+
+def test_canary_step_records_skip():
+    steps = []
+
+    def skipped():
+        raise tb.StepSkipped("session already authenticated")
+
+    tb._canary_step(steps, "login", skipped)
+    assert steps[0]["status"] == "skipped"
+    assert steps[0]["reason"] == "session already authenticated"
+    assert steps[0]["selectors"] == {}
+
+
+def test_read_cached_health_respects_ttl(tmp_path, monkeypatch):
+    cache = tmp_path / "canary_health.json"
+    monkeypatch.setattr(tb, "CANARY_HEALTH_FILE", cache)
+    health = {"status": "ok", "checked_at": datetime.now().isoformat(timespec="seconds")}
+    tb.write_cached_health(health, DummyLogger())
+    assert tb.read_cached_health(60, DummyLogger()) == health
+
+    stale = dict(health, checked_at=(datetime.now() - timedelta(minutes=5)).isoformat())
+    tb.write_cached_health(stale, DummyLogger())
+    assert tb.read_cached_health(60, DummyLogger()) is None
+
+
+def test_read_cached_health_rejects_missing_status(tmp_path, monkeypatch):
+    cache = tmp_path / "canary_health.json"
+    monkeypatch.setattr(tb, "CANARY_HEALTH_FILE", cache)
+    tb.write_cached_health({"checked_at": datetime.now().isoformat(timespec="seconds")}, DummyLogger())
+    assert tb.read_cached_health(60, DummyLogger()) is None
+
+
+def test_load_schedule_skips_invalid_entries():
+    settings = {
+        "schedule": {
+            "warmup_minutes": 3,
+            "actions": [
+                {"action": "stop", "at": "17:00"},
+                {"action": "pause", "at": "12:00"},
+                {"action": "dance", "at": "13:00"},
+                {"action": "start", "at": "13:30"},
+                {"action": "stop", "at": "25:99"},
+            ],
+        }
+    }
+    schedule = tb.load_schedule(settings, DummyLogger())
+    assert schedule["warmup_minutes"] == 3
+    assert [(at.strftime("%H:%M"), action) for at, action in schedule["actions"]] == [
+        ("12:00", "pause"),
+        ("17:00", "stop"),
+    ]
+
+
+def test_next_scheduled_action_wraps_to_tomorrow():
+    actions = tb.load_schedule(
+        {"schedule": {"actions": [{"action": "pause", "at": "12:00"}, {"action": "stop", "at": "17:00"}]}},
+        DummyLogger(),
+    )["actions"]
+    now = datetime(2024, 5, 6, 13, 0)
+    assert tb.next_scheduled_action(actions, now) == (datetime(2024, 5, 6, 17, 0), "stop")
+    later = datetime(2024, 5, 6, 17, 0)
+    assert tb.next_scheduled_action(actions, later) == (datetime(2024, 5, 7, 12, 0), "pause")
+
+
+def test_warmup_time_stays_in_first_half_of_window():
+    when = datetime(2024, 5, 6, 17, 0)
+    assert tb.warmup_time(when, 10, rng=lambda: 0.0) == datetime(2024, 5, 6, 16, 50)
+    assert tb.warmup_time(when, 10, rng=lambda: 1.0) == datetime(2024, 5, 6, 16, 55)
+
+
+def test_load_trace_settings_rejects_invalid_types():
+    assert tb.load_trace_settings({"tracing": "on"}, DummyLogger()) == {
+        "sample_rate": tb.DEFAULT_TRACE_SAMPLE_RATE,
+        "on_failure": True,
+        "max_bytes": tb.DEFAULT_TRACE_MAX_BYTES,
+    }
+    trace = tb.load_trace_settings({"tracing": {"on_failure": "false"}}, DummyLogger())
+    assert trace["on_failure"] is True
+
+
+def test_sleep_until_sleeps_in_short_chunks():
+    calls = []
+
+    class Interrupted(Exception):
+        pass
+
+    def fake_sleep(seconds):
+        calls.append(seconds)
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        tb.sleep_until(datetime.now() + timedelta(hours=1), sleep=fake_sleep)
+    assert calls == [tb.SLEEP_CHUNK_SECONDS]
+
+
+def test_run_scheduled_action_skips_late_slot(monkeypatch):
+    def no_browser(*args, **kwargs):
+        raise AssertionError("browser must not be opened for a missed slot")
+
+    monkeypatch.setattr(tb, "browser_session", no_browser)
+    monkeypatch.setattr(tb, "is_ssid_allowed", no_browser)
+    ctx = SimpleNamespace(logger=DummyLogger())
+    when = datetime.now() - tb.SCHEDULE_GRACE - timedelta(minutes=1)
+    tb.run_scheduled_action(ctx, "user", "pass", when, "stop", {"TestWiFi"})
+
+
+def test_missed_slot_allows_grace_period():
+    when = datetime(2024, 5, 6, 17, 0)
+    assert tb.missed_slot(when, "stop", DummyLogger(), now=when + timedelta(minutes=1)) is False
+    assert tb.missed_slot(when, "stop", DummyLogger(), now=when + timedelta(hours=15)) is True
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+        self.first = self
+
+    def is_visible(self):
+        return self.selector in self.page.visible
+
+    def wait_for(self, state, timeout):
+        raise AssertionError("punch must not wait for selectors when the button is visible")
+
+    def click(self):
+        self.page.clicked.append(self.selector)
+        self.page.visible = set(self.page.after_click)
+
+
+class FakePage:
+    url = "https://app.timebutler.com/do"
+
+    def __init__(self, visible, after_click=()):
+        self.visible = set(visible)
+        self.after_click = after_click
+        self.clicked = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def wait_for_timeout(self, ms):
+        return None
+
+
+def test_click_punch_button_pauses_with_single_click():
+    page = FakePage(
+        visible={tb.sel.RUNNING_INDICATORS[0], tb.sel.PAUSE_BUTTON[0]},
+        after_click={tb.sel.PAUSED_INDICATORS[0]},
+    )
+    assert tb.click_punch_button(page, "pause", DummyLogger()) is True
+    assert page.clicked == [tb.sel.PAUSE_BUTTON[0]]
+
+
+def test_click_punch_button_requires_paused_indicator_after_pause():
+    page = FakePage(visible={tb.sel.RUNNING_INDICATORS[0], tb.sel.PAUSE_BUTTON[0]}, after_click=())
+    with pytest.raises(RuntimeError):
+        tb.click_punch_button(page, "pause", DummyLogger(), confirm_timeout=0)
+
+
+def test_click_punch_button_skips_other_known_state():
+    page = FakePage(visible={tb.sel.START_BUTTON[0]})
+    assert tb.click_punch_button(page, "stop", DummyLogger()) is False
+    assert page.clicked == []
+
+
+def test_click_punch_button_fails_on_unknown_state():
+    page = FakePage(visible=set())
+    with pytest.raises(RuntimeError):
+        tb.click_punch_button(page, "stop", DummyLogger())
+    assert page.clicked == []
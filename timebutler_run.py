@@ -4,13 +4,16 @@ import argparse
 import json
 import logging
 import os
+import random
 import re
 import subprocess
 import sys
-from datetime import date, datetime
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Set
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set
 
 try:
     from dotenv import load_dotenv
@@ -33,8 +36,28 @@ CONFIG_DIR = BASE_DIR / "config"
 LAST_RUN_FILE = STATE_DIR / "last_run.txt"
 STORAGE_STATE_FILE = STATE_DIR / "storage_state.json"
 SETTINGS_FILE = CONFIG_DIR / "settings.json"
+TRACE_DIR = STATE_DIR / "traces"
+CANARY_HEALTH_FILE = STATE_DIR / "canary_health.json"
 LOG_FILE = LOG_DIR / "timebutler.log"
 TIMEBUTLER_URL = "https://app.timebutler.com/"
+DEFAULT_TRACE_SAMPLE_RATE = 0.0
+DEFAULT_TRACE_MAX_BYTES = 100_000_000
+DEFAULT_CANARY_TTL_SECONDS = 240
+DEFAULT_WARMUP_MINUTES = 5.0
+SCHEDULE_GRACE = timedelta(minutes=2)
+SLEEP_CHUNK_SECONDS = 30.0
+PUNCH_ACTIONS: Dict[str, Sequence[str]] = {
+    "start": sel.START_BUTTON,
+    "pause": sel.PAUSE_BUTTON,
+    "resume": sel.RESUME_BUTTON,
+    "stop": sel.STOP_BUTTON,
+}
+# Punch state each action requires beforehand, and the state that confirms it.
+PUNCH_TRANSITIONS: Dict[str, tuple[str, str]] = {
+    "pause": ("running", "paused"),
+    "resume": ("paused", "running"),
+    "stop": ("running", "stopped"),
+}
 
 
 class RunContext:
@@ -43,6 +66,8 @@ class RunContext:
         self.logger = logger
         self.now = datetime.now()
         self.screenshot_prefix = self.now.strftime("%Y%m%d_%H%M%S")
+        self.trace_settings: Dict[str, Any] = {}
+        self.trace_sampled = False
 
 
 def parse_args() -> argparse.Namespace:
@@ -70,34 +95,118 @@ def parse_args() -> argparse.Namespace:
         "--password",
         help="Override password (otherwise read from TIMEBUTLER_PASSWORD env).",
     )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Keep a Playwright trace of this run regardless of the sample rate.",
+    )
+    parser.add_argument(
+        "--canary",
+        action="store_true",
+        help="Validate the flow up to the Kommen/Start button without punching and print a JSON health status.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="With --canary, ignore the cached health status and check again.",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Run the scheduled pause/resume/stop punches from the settings file (keeps running).",
+    )
     return parser.parse_args()
 
 
 def ensure_directories() -> None:
-    for path in (STATE_DIR, LOG_DIR, CONFIG_DIR):
+    for path in (STATE_DIR, LOG_DIR, CONFIG_DIR, TRACE_DIR):
         path.mkdir(parents=True, exist_ok=True)
 
 
-def load_allowed_ssids(logger: logging.Logger) -> Set[str]:
+def load_settings(logger: logging.Logger) -> Dict[str, Any]:
     if not SETTINGS_FILE.exists():
         logger.error("Settings file not found: %s", SETTINGS_FILE)
-        return set()
-    
+        return {}
+
     try:
         data = json.loads(SETTINGS_FILE.read_text(encoding="utf-8"))
-        ssids = set(data.get("allowed_ssids", []))
-        if not ssids:
-            logger.warning("No 'allowed_ssids' found in settings file.")
-        return ssids
     except json.JSONDecodeError as exc:
         logger.error("Failed to parse settings file: %s", exc)
-        return set()
+        return {}
     except Exception as exc:
         logger.error("Error reading settings file: %s", exc)
-        return set()
+        return {}
+    if not isinstance(data, dict):
+        logger.error("Settings file must contain a JSON object.")
+        return {}
+    return data
+
+
+def settings_block(settings: Dict[str, Any], key: str, logger: logging.Logger) -> Dict[str, Any]:
+    block = settings.get(key)
+    if block is None:
+        return {}
+    if not isinstance(block, dict):
+        logger.warning("Ignoring '%s' settings: expected an object, got %s.", key, type(block).__name__)
+        return {}
+    return block
+
+
+def load_allowed_ssids(logger: logging.Logger, settings: Optional[Dict[str, Any]] = None) -> Set[str]:
+    data = load_settings(logger) if settings is None else settings
+    ssids = set(data.get("allowed_ssids", []))
+    if data and not ssids:
+        logger.warning("No 'allowed_ssids' found in settings file.")
+    return ssids
+
+
+def load_trace_settings(settings: Dict[str, Any], logger: logging.Logger) -> Dict[str, Any]:
+    raw = settings_block(settings, "tracing", logger)
+    try:
+        sample_rate = float(raw.get("sample_rate", DEFAULT_TRACE_SAMPLE_RATE))
+        max_bytes = int(raw.get("max_bytes", DEFAULT_TRACE_MAX_BYTES))
+    except (TypeError, ValueError) as exc:
+        logger.warning("Invalid 'tracing' settings, using defaults: %s", exc)
+        sample_rate, max_bytes = DEFAULT_TRACE_SAMPLE_RATE, DEFAULT_TRACE_MAX_BYTES
+    on_failure = raw.get("on_failure", True)
+    if not isinstance(on_failure, bool):
+        logger.warning("Invalid 'tracing.on_failure' setting %r, using default.", on_failure)
+        on_failure = True
+    return {
+        "sample_rate": min(max(sample_rate, 0.0), 1.0),
+        "on_failure": on_failure,
+        "max_bytes": max(max_bytes, 0),
+    }
+
+
+def should_sample_trace(sample_rate: float, rng=random.random) -> bool:
+    return sample_rate > 0 and rng() < sample_rate
+
+
+def prune_trace_store(max_bytes: int, logger: logging.Logger) -> None:
+    """Evicts the oldest traces until the store fits into ``max_bytes``.
+
+    The newest trace is always kept, even if it alone exceeds the limit.
+    """
+    try:
+        traces = sorted(TRACE_DIR.glob("trace_*.zip"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in traces)
+    except OSError as exc:
+        logger.warning("Failed to list trace store: %s", exc)
+        return
 
+    while len(traces) > 1 and total > max_bytes:
+        oldest = traces.pop(0)
+        try:
+            size = oldest.stat().st_size
+            oldest.unlink()
+            total -= size
+            logger.debug("Evicted trace %s (%d bytes).", oldest, size)
+        except OSError as exc:
+            logger.warning("Failed to evict trace %s: %s", oldest, exc)
 
-def init_logging(debug: bool) -> logging.Logger:
+
+def init_logging(debug: bool, stream=sys.stdout) -> logging.Logger:
     logger = logging.getLogger("timebutler")
     logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
@@ -110,7 +219,7 @@ def init_logging(debug: bool) -> logging.Logger:
     file_handler.setLevel(logging.DEBUG)
     logger.addHandler(file_handler)
 
-    console = logging.StreamHandler(sys.stdout)
+    console = logging.StreamHandler(stream)
     console.setFormatter(formatter)
     console.setLevel(logging.DEBUG if debug else logging.INFO)
     logger.addHandler(console)
@@ -162,6 +271,21 @@ def get_current_ssid(logger: logging.Logger) -> Optional[str]:
     return None
 
 
+def is_ssid_allowed(allowed_ssids: Set[str], logger: logging.Logger) -> bool:
+    ssid = get_current_ssid(logger)
+    if ssid is None:
+        logger.info("Unable to determine SSID.")
+        return False
+
+    normalized_ssid = ssid.strip()
+    if normalized_ssid not in allowed_ssids and normalized_ssid.lower() not in {
+        x.lower() for x in allowed_ssids
+    }:
+        logger.info("Current SSID '%s' not in the allowed list.", normalized_ssid)
+        return False
+    return True
+
+
 def already_ran_today(force: bool, logger: logging.Logger) -> bool:
     if force:
         return False
@@ -204,16 +328,17 @@ def is_logged_in(page) -> bool:
     return False
 
 
-def perform_login(page, username: str, password: str, logger: logging.Logger) -> None:
+def perform_login(page, username: str, password: str, logger: logging.Logger) -> Dict[str, str]:
+    """Logs in via the form and returns the selectors that matched."""
     logger.info("Performing login via form.")
-    sel.fill_first(page, sel.LOGIN_USER, username)
+    used = {"login_user": sel.fill_first(page, sel.LOGIN_USER, username)}
     sel.fill_first(page, sel.LOGIN_PASS, "")
-    sel.fill_first(page, sel.LOGIN_PASS, password)
+    used["login_pass"] = sel.fill_first(page, sel.LOGIN_PASS, password)
 
     # Close cookie consent banner before clicking submit
     sel.close_cookie_banner(page, logger)
 
-    sel.click_first(page, sel.LOGIN_SUBMIT)
+    used["login_submit"] = sel.click_first(page, sel.LOGIN_SUBMIT)
 
     # Wait for page to navigate and load after login
     logger.info("Waiting for login to complete...")
@@ -223,6 +348,7 @@ def perform_login(page, username: str, password: str, logger: logging.Logger) ->
     if not is_logged_in(page):
         logger.error(f"Login check failed. Current URL: {page.url}")
         raise RuntimeError("Login did not finish successfully.")
+    return used
 
 
 def ensure_on_dashboard(page, logger: logging.Logger) -> None:
@@ -232,18 +358,64 @@ def ensure_on_dashboard(page, logger: logging.Logger) -> None:
     page.goto(TIMEBUTLER_URL, wait_until="networkidle", timeout=30_000)
 
 
+class StepSkipped(Exception):
+    """Raised by a flow step that does not apply to the current UI state."""
+
+
+def _run_step(name: str, action: Callable[[], Any]) -> Any:
+    try:
+        return action()
+    except StepSkipped:
+        return None
+
+
+def open_authenticated_dashboard(
+    page,
+    ctx: RunContext,
+    username: str,
+    password: str,
+    step: Callable[[str, Callable[[], Any]], Any] = _run_step,
+) -> None:
+    """Opens Timebutler, logs in unless the saved session is still valid and shows the dashboard.
+
+    ``step`` wraps each phase (open, login, dashboard), e.g. to time it.
+    """
+
+    def open_page() -> None:
+        ctx.logger.info("Opening %s", TIMEBUTLER_URL)
+        page.goto(TIMEBUTLER_URL, wait_until="networkidle", timeout=30_000)
+
+    def login() -> Dict[str, str]:
+        if is_logged_in(page):
+            ctx.logger.info("Session already authenticated.")
+            raise StepSkipped("session already authenticated")
+        return perform_login(page, username, password, ctx.logger)
+
+    step("open", open_page)
+    step("login", login)
+    step("dashboard", lambda: ensure_on_dashboard(page, ctx.logger))
+
+
+def open_stempel_menu(
+    page, logger: logging.Logger, buttons: Sequence[str] = sel.START_BUTTON
+) -> Optional[str]:
+    """Opens the Stempeluhr menu if needed and returns the toggle selector clicked."""
+    # Try to find the button directly (if already visible)
+    if not sel.is_any_visible(page, buttons):
+        logger.info("Button not visible. Attempting to open Stempeluhr menu.")
+        try:
+            return sel.click_first(page, sel.STEMPEL_NAV_LINKS, timeout=5_000)
+        except sel.TimeoutError:
+            logger.warning("Could not find Stempeluhr menu toggle.")
+    return None
+
+
 def click_start_button(page, logger: logging.Logger) -> None:
     if sel.is_any_visible(page, sel.RUNNING_INDICATORS):
         logger.info("Zeiterfassung läuft bereits laut UI.")
         return
 
-    # Try to find start button directly (if already visible)
-    if not sel.is_any_visible(page, sel.START_BUTTON):
-        logger.info("Start button not visible. Attempting to open Stempeluhr menu.")
-        try:
-            sel.click_first(page, sel.STEMPEL_NAV_LINKS, timeout=5_000)
-        except sel.TimeoutError:
-            logger.warning("Could not find Stempeluhr menu toggle.")
+    open_stempel_menu(page, logger)
 
     try:
         sel.click_first(page, sel.START_BUTTON, timeout=10_000)
@@ -264,6 +436,87 @@ def click_start_button(page, logger: logging.Logger) -> None:
     raise RuntimeError("Start confirmation did not appear.")
 
 
+def punch_state(page) -> str:
+    """Returns the current UI state without waiting.
+
+    Every state needs positive evidence: paused or running indicators, or a
+    visible Kommen/Start button for stopped. Anything else is "unknown".
+    """
+    if sel.visible_now(page, sel.PAUSED_INDICATORS):
+        return "paused"
+    if sel.visible_now(page, sel.RUNNING_INDICATORS):
+        return "running"
+    if sel.visible_now(page, sel.START_BUTTON):
+        return "stopped"
+    return "unknown"
+
+
+def wait_for_punch_state(page, expected: str, timeout: float = 10_000, interval: float = 250) -> bool:
+    """Polls the punch state within a single ``timeout`` budget."""
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        if punch_state(page) == expected:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        page.wait_for_timeout(interval)
+
+
+def click_punch_button(page, action: str, logger: logging.Logger, confirm_timeout: float = 10_000) -> bool:
+    """Clicks the button for ``action`` and waits for the resulting state.
+
+    Returns False if the UI is in another known state (e.g. the user punched
+    manually). Raises RuntimeError if the state cannot be determined.
+    """
+    required, confirmation = PUNCH_TRANSITIONS[action]
+    state = punch_state(page)
+    if state == "unknown":
+        logger.error(f"Could not determine the time recording state. Current URL: {page.url}")
+        raise RuntimeError(f"Could not determine the time recording state before {action}.")
+    if state != required:
+        logger.warning("Zeiterfassung ist laut UI '%s', '%s' wird übersprungen.", state, action)
+        return False
+
+    buttons = PUNCH_ACTIONS[action]
+    # The warm-up already opened the menu, so this is normally a single click.
+    selector = sel.first_visible_now(page, buttons)
+    if selector is not None:
+        page.locator(selector).first.click()
+    else:
+        open_stempel_menu(page, logger, buttons)
+        try:
+            sel.click_first(page, buttons, timeout=10_000)
+        except sel.TimeoutError as exc:
+            logger.error(f"Could not find the {action} button. Current URL: {page.url}")
+            raise RuntimeError(f"Could not locate the {action} button.") from exc
+
+    logger.info("Clicked the %s button, waiting for confirmation.", action)
+
+    if not wait_for_punch_state(page, confirmation, timeout=confirm_timeout):
+        raise RuntimeError(f"{action.capitalize()} confirmation did not appear.")
+    logger.info("Time recording is %s after %s.", confirmation, action)
+    return True
+
+
+def probe_punch_button(page, action: str, logger: logging.Logger) -> Dict[str, str]:
+    """Locates the button for ``action`` without clicking it.
+
+    Returns the matched selectors, including the Stempeluhr toggle if it was opened.
+    """
+    used = {}
+    menu = open_stempel_menu(page, logger, PUNCH_ACTIONS[action])
+    if menu:
+        used["stempel_menu"] = menu
+
+    selector = sel.first_visible_selector(page, PUNCH_ACTIONS[action], timeout=10_000)
+    if selector is None:
+        logger.error(f"Could not find the {action} button. Current URL: {page.url}")
+        raise RuntimeError(f"Could not locate the {action} button.")
+    logger.info("Found the %s button via '%s'.", action, selector)
+    used[f"{action}_button"] = selector
+    return used
+
+
 def capture_debug_artifacts(page, ctx: RunContext) -> None:
     timestamp = ctx.screenshot_prefix
     png_path = STATE_DIR / f"error_{timestamp}.png"
@@ -280,7 +533,28 @@ def capture_debug_artifacts(page, ctx: RunContext) -> None:
         ctx.logger.error("Failed to save HTML dump: %s", exc)
 
 
-def run_playwright(ctx: RunContext, username: str, password: str) -> None:
+def stop_tracing(context, ctx: RunContext, failed: bool) -> None:
+    keep = ctx.trace_sampled or (failed and ctx.trace_settings.get("on_failure", True))
+    try:
+        if not keep:
+            # Discarding skips the costly export of the trace archive.
+            context.tracing.stop()
+            return
+        suffix = "error" if failed else "run"
+        trace_path = TRACE_DIR / f"trace_{ctx.screenshot_prefix}_{suffix}.zip"
+        context.tracing.stop(path=str(trace_path))
+        ctx.logger.info("Saved Playwright trace to %s", trace_path)
+        prune_trace_store(ctx.trace_settings.get("max_bytes", DEFAULT_TRACE_MAX_BYTES), ctx.logger)
+    except Exception as exc:  # pragma: no cover - best-effort
+        ctx.logger.error("Failed to save Playwright trace: %s", exc)
+
+
+@contextmanager
+def browser_session(ctx: RunContext, trace: bool = True) -> Iterator[tuple[Any, Any]]:
+    """Yields an authenticated-if-possible browser context and page.
+
+    With ``trace``, the session is recorded and kept if sampled or failed.
+    """
     if sync_playwright is None:  # pragma: no cover
         raise RuntimeError(
             "Playwright is not installed. Run 'pip install -r requirements.txt' and 'playwright install chromium'."
@@ -295,25 +569,135 @@ def run_playwright(ctx: RunContext, username: str, password: str) -> None:
         page.set_default_navigation_timeout(30_000)
         page.set_default_timeout(12_000)
 
+        tracing = trace and (ctx.trace_sampled or ctx.trace_settings.get("on_failure", True))
+        if tracing:
+            # Screenshots are the expensive part; unsampled runs only keep DOM snapshots for failures.
+            context.tracing.start(screenshots=ctx.trace_sampled, snapshots=True)
+        failed = False
+
         try:
-            ctx.logger.info("Opening %s", TIMEBUTLER_URL)
-            page.goto(TIMEBUTLER_URL, wait_until="networkidle", timeout=30_000)
+            yield context, page
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if tracing:
+                stop_tracing(context, ctx, failed)
+            context.close()
+            browser.close()
 
-            if not is_logged_in(page):
-                perform_login(page, username, password, ctx.logger)
-            else:
-                ctx.logger.info("Session already authenticated.")
 
-            ensure_on_dashboard(page, ctx.logger)
+def run_playwright(ctx: RunContext, username: str, password: str) -> None:
+    with browser_session(ctx) as (context, page):
+        try:
+            open_authenticated_dashboard(page, ctx, username, password)
             click_start_button(page, ctx.logger)
             context.storage_state(path=str(STORAGE_STATE_FILE))
             ctx.logger.info("Persisted Playwright storage state to %s", STORAGE_STATE_FILE)
         except Exception:
             capture_debug_artifacts(page, ctx)
             raise
-        finally:
-            context.close()
-            browser.close()
+
+
+def _canary_step(steps: List[Dict[str, Any]], name: str, action: Callable[[], Optional[Dict[str, str]]]) -> None:
+    step: Dict[str, Any] = {"name": name, "status": "fail", "selectors": {}, "duration_ms": 0}
+    steps.append(step)
+    started = time.perf_counter()
+    try:
+        step["selectors"] = action() or {}
+        step["status"] = "ok"
+    except StepSkipped as exc:
+        step["status"] = "skipped"
+        step["reason"] = str(exc)
+    finally:
+        step["duration_ms"] = round((time.perf_counter() - started) * 1000)
+
+
+def run_canary(ctx: RunContext, username: str, password: str) -> Dict[str, Any]:
+    """Runs the punch-in flow up to, but not including, the Kommen/Start click."""
+    steps: List[Dict[str, Any]] = []
+    health: Dict[str, Any] = {
+        "status": "ok",
+        "checked_at": datetime.now().isoformat(timespec="seconds"),
+        "running": None,
+        "error": None,
+        "steps": steps,
+    }
+    started = time.perf_counter()
+
+    def running_indicator() -> Dict[str, str]:
+        selector = sel.first_visible_selector(page, sel.RUNNING_INDICATORS)
+        health["running"] = selector is not None
+        return {"running_indicator": selector} if selector else {}
+
+    def punch_button(action: str) -> Callable[[], Dict[str, str]]:
+        # While running, Timebutler shows Stop instead of Start and vice versa.
+        def probe() -> Dict[str, str]:
+            if health["running"] != (action == "stop"):
+                state = "running" if health["running"] else "stopped"
+                raise StepSkipped(f"hidden while time recording is {state}")
+            return probe_punch_button(page, action, ctx.logger)
+
+        return probe
+
+    try:
+        # Not traced: the canary runs every few minutes and must stay cheap.
+        with browser_session(ctx, trace=False) as (_context, page):
+            open_authenticated_dashboard(
+                page, ctx, username, password, step=lambda name, action: _canary_step(steps, name, action)
+            )
+            _canary_step(steps, "running_indicator", running_indicator)
+            _canary_step(steps, "start_button", punch_button("start"))
+            _canary_step(steps, "stop_button", punch_button("stop"))
+            # The session is deliberately not persisted: storage_state.json is shared with
+            # real punches and the canary must not race them while writing it.
+    except Exception as exc:
+        ctx.logger.error("Canary check failed: %s", exc)
+        health["status"] = "fail"
+        health["error"] = str(exc)
+
+    health["duration_ms"] = round((time.perf_counter() - started) * 1000)
+    return health
+
+
+def read_cached_health(ttl_seconds: float, logger: logging.Logger) -> Optional[Dict[str, Any]]:
+    if not CANARY_HEALTH_FILE.exists():
+        return None
+    try:
+        health = json.loads(CANARY_HEALTH_FILE.read_text(encoding="utf-8"))
+        age = (datetime.now() - datetime.fromisoformat(health["checked_at"])).total_seconds()
+        if health.get("status") not in ("ok", "fail"):
+            raise ValueError(f"invalid status {health.get('status')!r}")
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+        logger.warning("Ignoring unreadable canary health cache: %s", exc)
+        return None
+    if 0 <= age < ttl_seconds:
+        logger.debug("Using cached canary health from %s.", health["checked_at"])
+        return health
+    return None
+
+
+def write_cached_health(health: Dict[str, Any], logger: logging.Logger) -> None:
+    try:
+        CANARY_HEALTH_FILE.write_text(json.dumps(health, indent=2), encoding="utf-8")
+    except OSError as exc:
+        logger.error("Failed to write canary health cache: %s", exc)
+
+
+def run_canary_mode(ctx: RunContext, username: str, password: str, settings: Dict[str, Any]) -> int:
+    try:
+        ttl = float(settings_block(settings, "canary", ctx.logger).get("ttl_seconds", DEFAULT_CANARY_TTL_SECONDS))
+    except (TypeError, ValueError) as exc:
+        ctx.logger.warning("Invalid 'canary.ttl_seconds' setting, using default: %s", exc)
+        ttl = DEFAULT_CANARY_TTL_SECONDS
+
+    health = None if ctx.args.no_cache else read_cached_health(ttl, ctx.logger)
+    if health is None:
+        health = run_canary(ctx, username, password)
+        write_cached_health(health, ctx.logger)
+
+    print(json.dumps(health))
+    return 0 if health["status"] == "ok" else 1
 
 
 def show_notification(title: str, message: str) -> None:
@@ -334,28 +718,163 @@ def show_notification(title: str, message: str) -> None:
         subprocess.run(["powershell", "-Command", ps_script], check=False, creationflags=subprocess.CREATE_NO_WINDOW)
     except Exception:
         # Fallback for systems where CREATE_NO_WINDOW might not be available or other errors
-        subprocess.run(["powershell", "-Command", ps_script], check=False)
+        try:
+            subprocess.run(["powershell", "-Command", ps_script], check=False)
+        except OSError:
+            # Notifications are best-effort; the scheduler must keep running without PowerShell.
+            pass
+
+
+def load_schedule(settings: Dict[str, Any], logger: logging.Logger) -> Dict[str, Any]:
+    raw = settings_block(settings, "schedule", logger)
+    try:
+        warmup_minutes = max(float(raw.get("warmup_minutes", DEFAULT_WARMUP_MINUTES)), 0.0)
+    except (TypeError, ValueError) as exc:
+        logger.warning("Invalid 'schedule.warmup_minutes' setting, using default: %s", exc)
+        warmup_minutes = DEFAULT_WARMUP_MINUTES
+
+    entries = raw.get("actions", [])
+    if not isinstance(entries, list):
+        logger.warning("Ignoring 'schedule.actions': expected a list, got %s.", type(entries).__name__)
+        entries = []
+
+    actions = []
+    for entry in entries:
+        try:
+            action = entry["action"]
+            at = datetime.strptime(entry["at"], "%H:%M").time()
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.warning("Ignoring invalid schedule entry %r: %s", entry, exc)
+            continue
+        if action not in PUNCH_TRANSITIONS:
+            logger.warning("Ignoring unknown schedule action '%s'.", action)
+            continue
+        actions.append((at, action))
+    return {"warmup_minutes": warmup_minutes, "actions": sorted(actions)}
+
+
+def next_scheduled_action(actions: List[tuple[dt_time, str]], now: datetime) -> tuple[datetime, str]:
+    for at, action in actions:
+        when = datetime.combine(now.date(), at)
+        if when > now:
+            return when, action
+    at, action = actions[0]
+    return datetime.combine(now.date() + timedelta(days=1), at), action
+
+
+def warmup_time(when: datetime, warmup_minutes: float, rng=random.random) -> datetime:
+    """Picks the warm-up start within the first half of the warm-up window.
+
+    The jitter spreads logins out across installations sharing a schedule.
+    """
+    window = timedelta(minutes=warmup_minutes)
+    return when - window + rng() * window / 2
+
+
+def sleep_until(when: datetime, sleep: Callable[[float], None] = time.sleep) -> None:
+    """Sleeps in short chunks so a suspended machine notices the wall clock moved on."""
+    while True:
+        remaining = (when - datetime.now()).total_seconds()
+        if remaining <= 0:
+            return
+        sleep(min(remaining, SLEEP_CHUNK_SECONDS))
+
+
+def missed_slot(when: datetime, action: str, logger: logging.Logger, now: Optional[datetime] = None) -> bool:
+    late = (now or datetime.now()) - when
+    if late > SCHEDULE_GRACE:
+        logger.warning(
+            "Skipping '%s' scheduled for %s: %d minutes late (machine asleep?).",
+            action,
+            when.isoformat(timespec="minutes"),
+            late.total_seconds() // 60,
+        )
+        return True
+    return False
+
+
+def run_scheduled_action(
+    ctx: RunContext, username: str, password: str, when: datetime, action: str, allowed_ssids: Set[str]
+) -> None:
+    if missed_slot(when, action, ctx.logger):
+        return
+    if not is_ssid_allowed(allowed_ssids, ctx.logger):
+        ctx.logger.info("Skipping scheduled '%s': not on an allowed Wi-Fi.", action)
+        return
+
+    with browser_session(ctx) as (context, page):
+        try:
+            ctx.logger.info("Warming up session for '%s' at %s.", action, when.strftime("%H:%M"))
+            open_authenticated_dashboard(page, ctx, username, password)
+            open_stempel_menu(page, ctx.logger, PUNCH_ACTIONS[action])
+
+            sleep_until(when, sleep=lambda seconds: page.wait_for_timeout(seconds * 1000))
+
+            if missed_slot(when, action, ctx.logger):
+                return
+            if not is_ssid_allowed(allowed_ssids, ctx.logger):
+                ctx.logger.info("Skipping scheduled '%s': not on an allowed Wi-Fi.", action)
+                return
+
+            if not click_punch_button(page, action, ctx.logger):
+                show_notification("Timebutler Auto", f"Geplantes '{action}' übersprungen, bitte prüfen!")
+                return
+            context.storage_state(path=str(STORAGE_STATE_FILE))
+            ctx.logger.info("Persisted Playwright storage state to %s", STORAGE_STATE_FILE)
+        except Exception:
+            capture_debug_artifacts(page, ctx)
+            raise
+
+
+def run_scheduler(
+    ctx: RunContext, username: str, password: str, settings: Dict[str, Any], allowed_ssids: Set[str]
+) -> int:
+    schedule = load_schedule(settings, ctx.logger)
+    if not schedule["actions"]:
+        ctx.logger.error("No valid 'schedule.actions' found in settings file.")
+        return 1
+
+    while True:
+        when, action = next_scheduled_action(schedule["actions"], datetime.now())
+        warm_at = warmup_time(when, schedule["warmup_minutes"])
+        ctx.logger.info(
+            "Next scheduled action '%s' at %s (warm-up at %s).",
+            action,
+            when.isoformat(timespec="minutes"),
+            warm_at.isoformat(timespec="seconds"),
+        )
+        sleep_until(warm_at)
+        ctx.screenshot_prefix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ctx.trace_sampled = ctx.args.trace or should_sample_trace(ctx.trace_settings["sample_rate"])
+        try:
+            run_scheduled_action(ctx, username, password, when, action, allowed_ssids)
+        except Exception as exc:
+            ctx.logger.exception("Scheduled action '%s' failed: %s", action, exc)
+            show_notification("Timebutler Auto", f"Geplantes '{action}' fehlgeschlagen!")
+        # Never pick the same slot twice, even if the punch finished early.
+        sleep_until(when + timedelta(seconds=1))
 
 
 def main() -> int:
     args = parse_args()
     ensure_directories()
-    logger = init_logging(debug=args.debug)
+    # Keep stdout clean for the JSON health status in canary mode.
+    logger = init_logging(debug=args.debug, stream=sys.stderr if args.canary else sys.stdout)
     username, password = load_credentials(args, logger)
-    allowed_ssids = load_allowed_ssids(logger)
+    settings = load_settings(logger)
+    allowed_ssids = load_allowed_ssids(logger, settings)
 
     ctx = RunContext(args, logger)
+    ctx.trace_settings = load_trace_settings(settings, logger)
+    ctx.trace_sampled = args.trace or should_sample_trace(ctx.trace_settings["sample_rate"])
 
-    ssid = get_current_ssid(logger)
-    if ssid is None:
-        logger.info("Unable to determine SSID. Skipping run.")
-        return 0
+    if args.canary:
+        return run_canary_mode(ctx, username, password, settings)
+    if args.schedule:
+        return run_scheduler(ctx, username, password, settings, allowed_ssids)
 
-    normalized_ssid = ssid.strip()
-    if normalized_ssid not in allowed_ssids and normalized_ssid.lower() not in {
-        x.lower() for x in allowed_ssids
-    }:
-        logger.info("Current SSID '%s' not in the allowed list. Exiting.", normalized_ssid)
+    if not is_ssid_allowed(allowed_ssids, logger):
+        logger.info("Skipping run.")
         return 0
 
     if already_ran_today(args.force_run, logger):